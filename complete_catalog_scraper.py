@@ -129,9 +129,11 @@ class TurboScraperOptimized:
     
     async def create_session(self) -> aiohttp.ClientSession:
         """Create optimized aiohttp session."""
+        # Size the keep-alive pool for the adaptive ceiling, not the starting
+        # concurrency, so raised concurrency reuses pooled connections
         connector = aiohttp.TCPConnector(
             limit=100,
-            limit_per_host=self.concurrency_manager.get_concurrency(),
+            limit_per_host=self.concurrency_manager.max_concurrency,
             ttl_dns_cache=300,
             use_dns_cache=True,
             keepalive_timeout=30,
@@ -293,7 +295,8 @@ class TurboScraperOptimized:
             
             return unique_products
     
-    async def scrape_catalog_optimized(self, base_url: str, max_time: float = 50.0) -> List[Dict[str, Any]]:
+    async def scrape_catalog_optimized(self, base_url: str, max_time: float = 50.0,
+                                       max_pages: int = 25, max_products: int = 300) -> List[Dict[str, Any]]:
         """Main optimized scraping method."""
         print(f"🔥 Starting optimized scraping of {base_url}")
         print(f"⚙️  Using {self.num_processes} CPU cores, time limit: {max_time}s")
@@ -304,7 +307,7 @@ class TurboScraperOptimized:
         try:
             # Phase 1: Generate pagination URLs (smart limit for speed)
             print("📄 Phase 1: Generating page URLs...")
-            page_urls = self.generate_smart_pagination_urls(base_url, max_pages=25)
+            page_urls = self.generate_smart_pagination_urls(base_url, max_pages=max_pages)
             print(f"   Generated {len(page_urls)} page URLs")
             
             # Phase 2: Fetch listing pages
@@ -323,7 +326,7 @@ class TurboScraperOptimized:
                 if time.time() - start_time > max_time * 0.4:
                     break
             
-            product_urls_list = list(all_product_urls)[:300]  # Focus on quality over quantity
+            product_urls_list = list(all_product_urls)[:max_products]  # Focus on quality over quantity
             print(f"   Found {len(product_urls_list)} product URLs")
             
             # Phase 4: Fetch product pages
@@ -396,6 +399,10 @@ def extract_product_chunk(html_pages: List[Tuple[str, str]]) -> List[Dict[str, A
     return products
 
 
+# Compiled once instead of per product
+PRICE_NUMBER_PATTERN = re.compile(r'[\d,]+(?:\.?\d*)')
+
+
 @lru_cache(maxsize=200)
 def get_selectors(selector_type: str) -> Tuple[str, ...]:
     """Get cached CSS selectors."""
@@ -442,10 +449,10 @@ def extract_product_fast(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
         for element in elements:
             price_text = element.get_text(strip=True)
             if 'KSh' in price_text or 'KES' in price_text:
-                numbers = re.findall(r'[\d,]+(?:\.?\d*)', price_text.replace(',', ''))
-                if numbers:
+                number = PRICE_NUMBER_PATTERN.search(price_text.replace(',', ''))
+                if number:
                     try:
-                        price_value = float(numbers[0])
+                        price_value = float(number.group())
                         if 10 <= price_value <= 10000000:
                             product['price_kes'] = price_value
                             product['original_currency'] = 'KES'
@@ -467,7 +474,8 @@ def extract_product_fast(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
     return product
 
 
-async def run_optimized_scraper(base_url: str, max_time: float = 50.0) -> List[Dict[str, Any]]:
+async def run_optimized_scraper(base_url: str, max_time: float = 50.0,
+                                max_pages: int = 25, max_products: int = 300) -> List[Dict[str, Any]]:
     """Run the optimized scraper."""
     if UVLOOP_AVAILABLE:
         try:
@@ -476,7 +484,7 @@ async def run_optimized_scraper(base_url: str, max_time: float = 50.0) -> List[D
             pass
     
     scraper = TurboScraperOptimized()
-    return await scraper.scrape_catalog_optimized(base_url, max_time)
+    return await scraper.scrape_catalog_optimized(base_url, max_time, max_pages, max_products)
 
 
 if __name__ == "__main__":
@@ -485,8 +493,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Optimized FAANG-Level Scraper")
     parser.add_argument("url", help="URL to scrape")
     parser.add_argument("--max-time", type=float, default=50.0, help="Max time in seconds")
+    parser.add_argument("--max-pages", type=int, default=25, help="Max listing pages to fetch")
+    parser.add_argument("--max-products", type=int, default=300, help="Max product pages to fetch")
     
     args = parser.parse_args()
     
-    products = asyncio.run(run_optimized_scraper(args.url, args.max_time))
+    products = asyncio.run(run_optimized_scraper(args.url, args.max_time, args.max_pages, args.max_products))
     print(f"\n🎯 FINAL RESULT: {len(products)} products scraped")
\ No newline at end of file
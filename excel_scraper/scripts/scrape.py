@@ -19,8 +19,11 @@ from pathlib import Path
 # Add the src directory to the path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from excel_scraper import FastExcelScraper, Config
-from excel_scraper.utils import is_valid_url, format_duration
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -95,6 +98,12 @@ Examples:
         help='Request timeout in seconds (default: 20)'
     )
     
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        help='Parse HTML in N worker processes (default: parse in the event loop)'
+    )
+    
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -128,6 +137,10 @@ Examples:
     return parser
 
 
+# Built once at import; main() may be called repeatedly (tests, wrappers)
+_PARSER = create_parser()
+
+
 def print_banner():
     """Print application banner."""
     print("🚀 EXCEL SCRAPER v1.0.0")
@@ -148,6 +161,9 @@ async def run_scraper(args) -> int:
     Returns:
         Exit code (0 for success, 1 for failure)
     """
+    # Imported here so --help/--version don't pay for aiohttp, pandas and openpyxl
+    from excel_scraper import FastExcelScraper, Config
+    from excel_scraper.utils import is_valid_url, format_duration
     
     # Validate URL
     if not is_valid_url(args.url):
@@ -183,6 +199,9 @@ async def run_scraper(args) -> int:
     if args.max_time:
         config.set('max_scraping_time', args.max_time)
     
+    if args.parse_workers:
+        config.set('parse_workers', args.parse_workers)
+    
     if args.verbose:
         config.set('log_level', 'DEBUG')
     
@@ -257,11 +276,14 @@ async def run_scraper(args) -> int:
 
 def main():
     """Main entry point."""
-    parser = create_parser()
-    args = parser.parse_args()
+    args = _PARSER.parse_args()
     
     print_banner()
     
+    # libuv-backed event loop cuts per-request scheduling overhead
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     try:
         exit_code = asyncio.run(run_scraper(args))
         sys.exit(exit_code)
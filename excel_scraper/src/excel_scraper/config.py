@@ -1,5 +1,31 @@
+import copy
 import json
-from typing import Any, Optional
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+@lru_cache(maxsize=8)
+def _load_config_file(config_path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a JSON config file; cached until the file's mtime changes."""
+    with open(config_path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge override into base, recursing into nested dicts so unset nested defaults survive."""
+    return {
+        key: _deep_merge(base[key], value)
+        if isinstance(value, dict) and isinstance(base.get(key), dict) else value
+        for key, value in {**base, **override}.items()
+    }
 
 
 class Config:
@@ -13,10 +39,13 @@ class Config:
             'request_delay': 0.1,           # Reduced from 0.3 to 0.1 seconds
             'product_request_delay': 0.05,  # Very short delay for product details
             'timeout': 15,                  # Reduced timeout for faster failures
+            'max_retries': 3,               # Retries for 429/503 (honours Retry-After)
+            'fast_response_time': 0,        # Opt-in: skip request delays while responses arrive faster (seconds, 0 = always delay)
             'max_products_per_page': 50,
             'max_pages': 999,  # For full catalog scraping
             'output_dir': 'output',
             'file_prefix': 'scraped_products',
+            'excel_compress_level': 1,      # xlsx deflate level (1 = fastest, 9 = smallest)
             'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             
             # Connection optimization
@@ -28,6 +57,7 @@ class Config:
             'use_lxml': True,              # Use fast lxml parser
             'extract_images': True,        # Set to False to skip image extraction for speed
             'extract_descriptions': True,  # Set to False to skip descriptions for speed
+            'parse_workers': 0,            # HTML parsing processes (0 = parse in event loop, None = CPU count; needs a __main__ guard)
             
             'polish_venture': {
                 'product_selectors': ['.product-item', '.product', '.woocommerce-loop-product__link']
@@ -36,8 +66,9 @@ class Config:
         
         if config_path:
             try:
-                with open(config_path) as f:
-                    self.config.update(json.load(f))
+                cached = _load_config_file(config_path, os.path.getmtime(config_path))
+                # Copy so set() on one Config never leaks into the shared cache
+                self.config = _deep_merge(self.config, copy.deepcopy(cached))
             except:
                 pass
     
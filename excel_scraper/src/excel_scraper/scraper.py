@@ -3,17 +3,40 @@ Fast Excel Scraper - Optimized async web scraper for sub-50 second performance.
 """
 
 import asyncio
+import json
+import multiprocessing
+import os
+import re
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 
 import aiohttp
-import pandas as pd
+import soupsieve as sv
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
+from zipfile import ZipFile, ZIP_DEFLATED
+
+try:
+    import lxml  # noqa: F401 - fast parser for BeautifulSoup and openpyxl's XML writer
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
 
 from .config import Config
-from .utils import setup_logging, generate_filename, ensure_directory_exists, clean_product_name
+from .utils import setup_logging, generate_filename, ensure_directory_exists, clean_product_name, element_text
+
+# pandas/openpyxl are only needed to save results; importing them lazily keeps
+# them out of startup and out of spawned HTML parsing workers
+if TYPE_CHECKING:
+    import pandas as pd
+    from openpyxl import Workbook
+
+# Responses that mean "slow down", retried with backoff instead of dropped
+RETRY_STATUSES = (429, 503)
+MAX_RETRY_DELAY = 60
 
 
 class FastExcelScraper:
@@ -29,9 +52,41 @@ class FastExcelScraper:
         self.config = config or Config()
         self.session = None
         self.logger = setup_logging()
+        self._next_request_at = 0.0
+        self._next_product_request_at = 0.0
+        self._host_is_fast = False
+        self._product_semaphore = None
+        self._parse_executor = None
+        self._seen_product_urls = set()
+        self._deadline = None
+        self._cache_settings()
+        
+        if self.config.get('use_lxml', True) and not LXML_AVAILABLE:
+            self.logger.warning("lxml not installed; using html.parser and openpyxl's slower XML writer (pip install lxml)")
+    
+    def _cache_settings(self) -> None:
+        """Snapshot per-request settings so hot paths skip Config.get lookups."""
+        self._request_interval = (
+            self.config.get('request_delay', 0) / max(self.config.get('max_concurrent_requests', 1), 1)
+        )
+        self._max_concurrent_products = self.config.get('max_concurrent_products', 20)
+        self._product_request_interval = (
+            self.config.get('product_request_delay', 0.05) / max(self._max_concurrent_products, 1)
+        )
+        self._extract_descriptions = self.config.get('extract_descriptions', True)
+        self._extract_images = self.config.get('extract_images', True)
+        self._parse_workers = self.config.get('parse_workers', 0)
+        self._max_retries = self.config.get('max_retries', 3)
+        self._fast_response_time = self.config.get('fast_response_time', 0)
+        self._html_parser = 'lxml' if LXML_AVAILABLE and self.config.get('use_lxml', True) else 'html.parser'
         
     async def create_session(self) -> None:
         """Create aiohttp session with high-performance settings."""
+        self._cache_settings()
+        
+        # One product-detail cap for the whole run, shared by concurrently scraped pages
+        self._product_semaphore = asyncio.Semaphore(self._max_concurrent_products)
+        
         connector = aiohttp.TCPConnector(
             limit=self.config.get('connection_limit', 100),
             limit_per_host=self.config.get('connection_limit_per_host', 30),
@@ -64,57 +119,132 @@ class FastExcelScraper:
         )
     
     async def close_session(self) -> None:
-        """Close aiohttp session."""
+        """Close aiohttp session and the HTML parsing workers."""
         if self.session:
             await self.session.close()
+        
+        if self._parse_executor:
+            self._parse_executor.shutdown()
+            self._parse_executor = None
     
-    async def fetch_page(self, url: str, semaphore: asyncio.Semaphore) -> Optional[str]:
+    async def fetch_page(self, url: str, semaphore: asyncio.Semaphore, product: bool = False) -> Optional[str]:
         """
         Fetch a single page with semaphore control.
         
+        Rate-limited responses (429/503) are retried up to max_retries times,
+        waiting for the server's Retry-After or an exponential backoff.
+        Request pacing is skipped while the host keeps answering quickly.
+        
         Args:
             url: URL to fetch
             semaphore: Semaphore for concurrency control
+            product: Pace as a product detail request and log failures at debug level
         
         Returns:
             Page content or None
         """
-        async with semaphore:
-            try:
-                async with self.session.get(url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        return content
-                    else:
-                        self.logger.warning(f"HTTP {response.status} for {url}")
-                        return None
-            except Exception as e:
-                self.logger.error(f"Error fetching {url}: {e}")
-                return None
-            finally:
-                await asyncio.sleep(self.config.get('request_delay'))
+        loop = asyncio.get_running_loop()
+        
+        for attempt in range(self._max_retries + 1):
+            await self._wait_for_request_slot(product)
+            
+            async with semaphore:
+                # Queued requests are dropped once the scrape's time limit has passed
+                if self._past_deadline():
+                    return None
+                
+                try:
+                    started = loop.time()
+                    async with self.session.get(url) as response:
+                        if response.status == 200:
+                            self._host_is_fast = loop.time() - started < self._fast_response_time
+                            content = await response.text()
+                            return content
+                        
+                        # Errors and rate limits: go back to pacing every request
+                        self._host_is_fast = False
+                        
+                        if response.status in RETRY_STATUSES and attempt < self._max_retries:
+                            delay = self._retry_delay(response.headers.get('Retry-After'), attempt)
+                        else:
+                            log = self.logger.debug if product else self.logger.warning
+                            log("HTTP %s for %s", response.status, url)
+                            return None
+                except Exception as e:
+                    self._host_is_fast = False
+                    log = self.logger.debug if product else self.logger.error
+                    log("Error fetching %s: %s", url, e)
+                    return None
+            
+            # Back off without holding a semaphore slot
+            self.logger.debug("HTTP %s for %s, retrying in %.1fs", response.status, url, delay)
+            await asyncio.sleep(delay)
+    
+    def _past_deadline(self) -> bool:
+        """Whether the current scrape has run past its max_scraping_time."""
+        return self._deadline is not None and time.time() > self._deadline
+    
+    @staticmethod
+    def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+        """Seconds to wait before a retry: Retry-After if given, else 1s, 2s, 4s... (max 60s)."""
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = 2 ** attempt
+        return min(max(delay, 0), MAX_RETRY_DELAY)
+    
+    async def _wait_for_request_slot(self, product: bool = False) -> None:
+        """Space out page or product request starts (shared delay budget, no semaphore slot held)."""
+        if self._host_is_fast:
+            return
+        
+        now = asyncio.get_running_loop().time()
+        if product:
+            start_at = max(now, self._next_product_request_at)
+            self._next_product_request_at = start_at + self._product_request_interval
+        else:
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + self._request_interval
+        
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+    
+    async def _parse(self, func, *args):
+        """Run a CPU-bound HTML parser in the worker process pool."""
+        if self._parse_workers == 0:
+            return func(*args)
+        
+        if self._parse_executor is None:
+            # Never fork from inside the running loop: children would inherit the
+            # session's keep-alive sockets and the logging listener thread
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self._parse_executor = ProcessPoolExecutor(
+                max_workers=self._parse_workers or os.cpu_count(),
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._parse_executor, func, *args)
     
     async def extract_product_data(self, html: str, base_url: str) -> List[Dict[str, Any]]:
         """Extract product data from HTML - Polish Venture optimized."""
-        soup = BeautifulSoup(html, 'lxml')
-        return await self._extract_polish_venture_products(soup, base_url)
+        product_links = await self._parse(parse_listing_page, html, base_url, self._html_parser)
+        return await self._extract_polish_venture_products(product_links)
     
-    async def _extract_polish_venture_products(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, Any]]:
+    async def _extract_polish_venture_products(self, product_links: List[str]) -> List[Dict[str, Any]]:
         """Extract products from Polish Venture - optimized for speed with async."""
         products = []
         
-        # Extract product links for detailed scraping
-        product_links = self._extract_product_links(soup, base_url)
-        
-        if product_links:
+        # Don't fan out to product pages once the time limit has passed
+        if product_links and not self._past_deadline():
             max_products = self.config.get('max_products_per_page', 50)
-            limited_links = product_links[:max_products]
             
-            # Create semaphore for product detail requests
-            product_semaphore = asyncio.Semaphore(self.config.get('max_concurrent_products', 20))
+            # Skip products already fetched from an earlier page in this run
+            limited_links = [url for url in product_links[:max_products] if url not in self._seen_product_urls]
+            self._seen_product_urls.update(limited_links)
             
             # Fetch all product details concurrently
-            tasks = [self._extract_polish_venture_product_async(url, product_semaphore) for url in limited_links]
+            tasks = [self._extract_polish_venture_product_async(url, self._product_semaphore) for url in limited_links]
             product_results = await asyncio.gather(*tasks, return_exceptions=True)
             
             # Collect valid results
@@ -122,7 +252,7 @@ class FastExcelScraper:
                 if isinstance(result, dict) and result.get('name'):
                     products.append(result)
                 elif isinstance(result, Exception):
-                    self.logger.debug(f"Product extraction failed: {result}")
+                    self.logger.debug("Product extraction failed: %s", result)
         
         return products
     
@@ -143,11 +273,13 @@ class FastExcelScraper:
     
     async def scrape_full_catalog(self, base_url: str) -> List[Dict[str, Any]]:
         """Scrape entire catalog with automatic pagination and time limits."""
-        self.logger.info(f"Starting FULL CATALOG scrape of {base_url}")
+        self.logger.info("Starting FULL CATALOG scrape of %s", base_url)
         
         if not self.session:
             await self.create_session()
         
+        self._seen_product_urls.clear()
+        
         all_products = []
         page = 1
         consecutive_empty_pages = 0
@@ -155,44 +287,61 @@ class FastExcelScraper:
         start_time = time.time()
         max_time = self.config.get('max_scraping_time')
         
-        while consecutive_empty_pages < max_empty_pages and page <= 999:
+        # Checked before every page and product request, not just between batches,
+        # so a batch can't overshoot the limit by its whole product fan-out
+        self._deadline = start_time + max_time if max_time else None
+        
+        # Pages are fetched in concurrent batches; results are still
+        # processed in page order so the empty-page stop rule is unchanged
+        batch_size = self.config.get('max_concurrent_requests')
+        semaphore = asyncio.Semaphore(batch_size)
+        page_urls = self.construct_page_urls(base_url, 999)
+        
+        while consecutive_empty_pages < max_empty_pages and page <= len(page_urls):
             # Check time limit
             if max_time and (time.time() - start_time) > max_time:
-                self.logger.info(f"Time limit reached ({max_time}s), stopping scrape")
+                self.logger.info("Time limit reached (%ss), stopping scrape", max_time)
                 break
-                
-            page_url = f"{base_url}?page={page}" if page > 1 else base_url
             
-            self.logger.info(f"Scraping page {page}: {page_url}")
+            batch_urls = page_urls[page - 1:page - 1 + batch_size]
+            batch_pages = range(page, page + len(batch_urls))
             
-            # Create semaphore for this page
-            semaphore = asyncio.Semaphore(1)  # One page at a time for full catalog
-            html = await self.fetch_page(page_url, semaphore)
+            self.logger.info("Scraping pages %s-%s", batch_pages[0], batch_pages[-1])
             
-            if html:
-                products = await self.extract_product_data(html, page_url)
+            tasks = [self._scrape_page(url, semaphore) for url in batch_urls]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            timed_out = self._past_deadline()
+            
+            for page_num, products in zip(batch_pages, results):
+                page = page_num + 1
                 
-                if products:
+                if isinstance(products, list) and products:
                     all_products.extend(products)
                     consecutive_empty_pages = 0
-                    self.logger.info(f"Page {page}: Found {len(products)} products (Total: {len(all_products)})")
+                    self.logger.info("Page %s: Found %s products (Total: %s)", page_num, len(products), len(all_products))
+                elif timed_out:
+                    # Cut short by the time limit; not an empty or failed page
+                    continue
+                elif isinstance(products, list):
+                    consecutive_empty_pages += 1
+                    self.logger.warning("Page %s: No products found (Empty pages: %s)", page_num, consecutive_empty_pages)
+                elif isinstance(products, Exception):
+                    consecutive_empty_pages += 1
+                    self.logger.error("Page %s failed: %s", page_num, products)
                 else:
                     consecutive_empty_pages += 1
-                    self.logger.warning(f"Page {page}: No products found (Empty pages: {consecutive_empty_pages})")
-            else:
-                consecutive_empty_pages += 1
-                self.logger.error(f"Page {page}: Failed to fetch")
-            
-            page += 1
+                    self.logger.error("Page %s: Failed to fetch", page_num)
+                
+                if consecutive_empty_pages >= max_empty_pages:
+                    break
             
-            # Progress report every 10 pages
-            if page % 10 == 0:
-                self.logger.info(f"Progress: Page {page}, Total products: {len(all_products)}")
+            # Progress report after every batch
+            self.logger.info("Progress: Page %s, Total products: %s", page, len(all_products))
         
         # Remove duplicates
         unique_products = self._deduplicate_products(all_products)
         
-        self.logger.info(f"Full catalog scrape complete: {len(unique_products)} unique products from {page-1} pages")
+        self.logger.info("Full catalog scrape complete: %s unique products from %s pages", len(unique_products), page-1)
         return unique_products
     
     async def scrape_website_async(self, base_url: str) -> List[Dict[str, Any]]:
@@ -205,12 +354,15 @@ class FastExcelScraper:
         Returns:
             List of scraped products
         """
-        self.logger.info(f"Starting async scraping of {base_url}")
+        self.logger.info("Starting async scraping of %s", base_url)
         start_time = time.time()
         
         if not self.session:
             await self.create_session()
         
+        self._seen_product_urls.clear()
+        self._deadline = None
+        
         # Generate page URLs
         max_pages = self.config.get('max_pages')
         page_urls = self.construct_page_urls(base_url, max_pages)
@@ -218,280 +370,55 @@ class FastExcelScraper:
         # Create semaphore for concurrency control
         semaphore = asyncio.Semaphore(self.config.get('max_concurrent_requests'))
         
-        # Fetch all pages concurrently
-        tasks = [self.fetch_page(url, semaphore) for url in page_urls]
-        html_pages = await asyncio.gather(*tasks, return_exceptions=True)
+        # Fetch and extract each page concurrently; a page's products are
+        # extracted as soon as it arrives and its HTML is then released
+        tasks = [self._scrape_page(url, semaphore) for url in page_urls]
+        page_results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # Extract products from all pages concurrently
         all_products = []
-        extraction_tasks = []
-        
-        for i, html in enumerate(html_pages):
-            if isinstance(html, str) and html:
-                task = self.extract_product_data(html, page_urls[i])
-                extraction_tasks.append((i+1, task))
-            elif isinstance(html, Exception):
-                self.logger.error(f"Page {i+1} failed: {html}")
-        
-        # Process all product extractions concurrently
-        if extraction_tasks:
-            extraction_results = await asyncio.gather(*[task for _, task in extraction_tasks], return_exceptions=True)
-            
-            for (page_num, _), result in zip(extraction_tasks, extraction_results):
-                if isinstance(result, list):
-                    all_products.extend(result)
-                    self.logger.info(f"Page {page_num}: Found {len(result)} products")
-                elif isinstance(result, Exception):
-                    self.logger.error(f"Page {page_num} extraction failed: {result}")
+        for page_num, result in enumerate(page_results, 1):
+            if isinstance(result, list):
+                all_products.extend(result)
+                self.logger.info("Page %s: Found %s products", page_num, len(result))
+            elif isinstance(result, Exception):
+                self.logger.error("Page %s failed: %s", page_num, result)
         
         # Remove duplicates
         unique_products = self._deduplicate_products(all_products)
         
-        self.logger.info(f"Total unique products found: {len(unique_products)}")
+        self.logger.info("Total unique products found: %s", len(unique_products))
         return unique_products
     
+    async def _scrape_page(self, url: str, semaphore: asyncio.Semaphore) -> Optional[List[Dict[str, Any]]]:
+        """Fetch one listing page and extract its products (None if the fetch failed)."""
+        html = await self.fetch_page(url, semaphore)
+        if not html:
+            return None
+        return await self.extract_product_data(html, url)
+    
     def _deduplicate_products(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate products."""
-        seen = set()
-        unique_products = []
+        """Remove duplicate products (dict keeps first-seen key order)."""
+        unique_products = {}
         
         for product in products:
-            key = product.get('product_url') or product.get('name', '')
-            if key and key not in seen:
-                seen.add(key)
-                unique_products.append(product)
+            key = product.get('source_url') or product.get('name', '')
+            if key:
+                unique_products.setdefault(key, product)
         
-        return unique_products
-    
-    def _extract_product_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Extract product page links from listing page."""
-        product_links = set()
-        
-        # Polish Venture specific product link selectors
-        link_selectors = [
-            'a[href*="/product/"]',
-            '.product-item a[href]',
-            '.product a[href]',
-            '.woocommerce-loop-product__link[href]',
-            'h2 a[href]',
-            'h3 a[href]'
-        ]
-        
-        for selector in link_selectors:
-            links = soup.select(selector)
-            for link in links:
-                href = link.get('href')
-                if href:
-                    absolute_url = urljoin(base_url, href)
-                    if self._is_product_url(absolute_url):
-                        product_links.add(absolute_url)
-        
-        return list(product_links)
-    
-    def _is_product_url(self, url: str) -> bool:
-        """Check if URL is a product page."""
-        url_lower = url.lower()
-        return (
-            '/product/' in url_lower and
-            not any(exclude in url_lower for exclude in [
-                'add-to-cart', 'filter', 'page=', 'orderby=', 'category'
-            ])
-        )
+        return list(unique_products.values())
     
     async def _extract_polish_venture_product_async(self, product_url: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
         """Extract detailed product data from Polish Venture product page (async)."""
-        async with semaphore:
-            try:
-                async with self.session.get(product_url) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'lxml')
-                        return self._extract_polish_venture_data(soup, product_url)
-                    else:
-                        self.logger.debug(f"HTTP {response.status} for product {product_url}")
-                        return {}
-                        
-            except Exception as e:
-                self.logger.debug(f"Error scraping product {product_url}: {e}")
-                return {}
-            finally:
-                # Shorter delay for product detail requests
-                await asyncio.sleep(self.config.get('product_request_delay', 0.05))
-    
-    def _extract_polish_venture_data(self, soup: BeautifulSoup, product_url: str) -> Dict[str, Any]:
-        """Extract detailed data from Polish Venture product page - speed optimized."""
-        import re
-        import json as json_module
-        
-        product_data = {
-            'source_url': product_url,
-            'scraped_at': time.time()
-        }
-        
-        # Quick exit if page seems invalid
-        if not soup.title or len(soup.get_text()) < 100:
+        # Shorter delay budget and quieter logging for product detail requests
+        html = await self.fetch_page(product_url, semaphore, product=True)
+        if not html:
             return {}
         
-        # Extract product name
-        name_selectors = [
-            'h1.entry-title', 'h1.product_title', 'h1.product-title',
-            '.product_title', '.entry-title', 'h1'
-        ]
-        
-        for selector in name_selectors:
-            element = soup.select_one(selector)
-            if element:
-                name = element.get_text(strip=True)
-                if name and len(name) > 3:
-                    product_data['name'] = clean_product_name(name)
-                    break
-        
-        # Extract price with multiple methods
-        all_prices = []
-        
-        # Method 1: Structured data (JSON-LD)
-        json_scripts = soup.find_all('script', type='application/ld+json')
-        for script in json_scripts:
-            try:
-                data = json_module.loads(script.string)
-                if isinstance(data, dict) and '@graph' in data:
-                    for item in data['@graph']:
-                        if item.get('@type') == 'Product' and 'offers' in item:
-                            for offer in item['offers']:
-                                if 'priceSpecification' in offer:
-                                    for price_spec in offer['priceSpecification']:
-                                        price_str = price_spec.get('price')
-                                        if price_str:
-                                            try:
-                                                price_value = float(price_str)
-                                                if price_value > 0:
-                                                    all_prices.append(price_value)
-                                                    break
-                                            except ValueError:
-                                                continue
-            except (json_module.JSONDecodeError, KeyError, TypeError):
-                continue
-        
-        # Method 2: Main product area
-        if not all_prices:
-            main_areas = ['.single-product-wrapper', '.product-detail', '.entry-summary', '.summary']
-            main_area = None
-            for area_selector in main_areas:
-                main_area = soup.select_one(area_selector)
-                if main_area:
-                    break
-            
-            if main_area:
-                price_selectors = [
-                    '.woocommerce-Price-amount bdi', '.woocommerce-Price-amount',
-                    '.price .amount', '.price bdi', '.price'
-                ]
-                
-                for selector in price_selectors:
-                    elements = main_area.select(selector)
-                    for element in elements:
-                        price_text = element.get_text(strip=True)
-                        if 'KSh' in price_text or 'KES' in price_text:
-                            cleaned_text = price_text.replace('KSh', '').replace('KES', '').replace(',', '').strip()
-                            numbers = re.findall(r'\d+(?:\.\d+)?', cleaned_text)
-                            if numbers:
-                                try:
-                                    price_value = float(numbers[0])
-                                    if price_value > 100:  # Filter out obvious errors
-                                        all_prices.append(price_value)
-                                except ValueError:
-                                    continue
-        
-        # Set pricing information
-        if all_prices:
-            price = all_prices[0]  # Take the first valid price
-            product_data['price_kes'] = price
-            product_data['original_currency'] = 'KES'
-            product_data['raw_price_text'] = f'KSh {price:,.2f}'
-        
-        # Extract SKU
-        sku_selectors = ['.sku', '.product_meta .sku', '[data-sku]']
-        for selector in sku_selectors:
-            element = soup.select_one(selector)
-            if element:
-                sku = element.get_text(strip=True)
-                if sku:
-                    product_data['sku'] = sku
-                    break
-        
-        # Extract brand
-        brand_selectors = ['.brand', '.product_meta .brand', '[data-brand]']
-        for selector in brand_selectors:
-            element = soup.select_one(selector)
-            if element:
-                brand = element.get_text(strip=True)
-                if brand:
-                    product_data['brand'] = brand
-                    break
-        
-        # Extract category
-        category_selectors = ['.product_meta .posted_in a', '.breadcrumb a', '.category a']
-        categories = []
-        for selector in category_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                cat = element.get_text(strip=True)
-                if cat and cat.lower() not in ['home', 'shop']:
-                    categories.append(cat)
-        
-        if categories:
-            product_data['category'] = ' > '.join(categories[:3])  # Limit to 3 levels
-        
-        # Extract description (only if enabled for speed)
-        if self.config.get('extract_descriptions', True):
-            desc_selectors = [
-                '.woocommerce-product-details__short-description',
-                '.product-short-description', '.entry-summary p', '.summary p'
-            ]
-            for selector in desc_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    desc = element.get_text(strip=True)
-                    if desc and len(desc) > 20:
-                        product_data['description'] = desc[:300]  # Reduced from 500 to 300
-                        break
-        
-        # Extract stock status
-        stock_element = soup.select_one('.stock')
-        if stock_element:
-            stock_text = stock_element.get_text(strip=True).lower()
-            if 'in stock' in stock_text:
-                product_data['stock_status'] = 'In Stock'
-            elif 'out of stock' in stock_text:
-                product_data['stock_status'] = 'Out of Stock'
-        
-        # Extract images (only if enabled in config for speed)
-        if self.config.get('extract_images', True):
-            image_selectors = [
-                '.woocommerce-product-gallery img', '.product-image img',
-                '.wp-post-image', '.attachment-shop_single'
-            ]
-            images = []
-            for selector in image_selectors:
-                elements = soup.select(selector)
-                for img in elements[:3]:  # Reduced from 5 to 3 for speed
-                    src = img.get('src') or img.get('data-src')
-                    if src:
-                        images.append(urljoin(product_url, src))
-                        break  # Just get first valid image from each selector
-            
-            product_data['images'] = images
-            product_data['primary_image'] = images[0] if images else None
-        else:
-            product_data['images'] = []
-            product_data['primary_image'] = None
-        
-        # Check for warranty and shipping info
-        page_text = soup.get_text().lower()
-        product_data['has_warranty'] = 'warranty' in page_text or 'guarantee' in page_text
-        product_data['has_shipping_info'] = 'shipping' in page_text or 'delivery' in page_text
-        
-        return product_data
+        # Parse outside the semaphore so the slot is free for the next download
+        return await self._parse(
+            parse_product_page, html, product_url,
+            self._extract_descriptions, self._extract_images, self._html_parser
+        )
     
     def save_to_excel(self, products: List[Dict[str, Any]], 
                       filename: Optional[str] = None, 
@@ -514,132 +441,411 @@ class FastExcelScraper:
         if not output_dir:
             output_dir = self.config.get('output_dir')
         
+        import pandas as pd
+        from openpyxl import Workbook
+        from openpyxl.writer.excel import ExcelWriter
+        
         ensure_directory_exists(output_dir)
         file_path = f"{output_dir}/{filename}"
         
-        # Prepare data in legacy format
-        excel_data = []
-        for i, product in enumerate(products, 1):
-            row = {
-                'Product ID': i,
-                'Product Name': product.get('name', ''),
-                'Price (KES)': product.get('price_kes', 0),
-                'Original Currency': product.get('original_currency', ''),
-                'SKU': product.get('sku', ''),
-                'Brand': product.get('brand', ''),
-                'Category': product.get('category', ''),
-                'Stock Status': product.get('stock_status', ''),
-                'Description': product.get('description', '')[:200] + ('...' if len(product.get('description', '')) > 200 else ''),
-                'Primary Image URL': product.get('primary_image', ''),
-                'Total Images': len(product.get('images', [])),
-                'Source URL': product.get('source_url', ''),
-                'Scraped Date': datetime.fromtimestamp(
-                    product.get('scraped_at', 0)
-                ).strftime('%Y-%m-%d %H:%M:%S'),
-                'Has Warranty': product.get('has_warranty', False),
-                'Has Shipping Info': product.get('has_shipping_info', False)
-            }
-            
-            # Add pricing breakdown if available
-            if product.get('price_jpy'):
-                row['Price (JPY)'] = product.get('price_jpy', 0)
-                row['Exchange Rate Used'] = product.get('exchange_rate', 0)
-            
-            # Add specifications if available
-            if product.get('specifications'):
-                specs = product.get('specifications', {})
-                row['Specifications'] = '; '.join([f"{k}: {v}" for k, v in specs.items() if k and v])
-            
-            excel_data.append(row)
+        def column(key, default=''):
+            return [product.get(key, default) for product in products]
+        
+        descriptions = [product.get('description') or '' for product in products]
+        jpy_prices = [product.get('price_jpy') for product in products]
+        
+        # Prepare data in legacy format, one list per column built in its own pass
+        columns = {
+            'Product ID': list(range(1, len(products) + 1)),
+            'Product Name': column('name'),
+            'Price (KES)': column('price_kes', 0),
+            'Original Currency': column('original_currency'),
+            'SKU': column('sku'),
+            'Brand': column('brand'),
+            'Category': column('category'),
+            'Stock Status': column('stock_status'),
+            'Description': [desc[:200] + ('...' if len(desc) > 200 else '') for desc in descriptions],
+            'Primary Image URL': column('primary_image'),
+            'Total Images': [len(images) for images in column('images', [])],
+            'Source URL': column('source_url'),
+            'Scraped Date': column('scraped_at', 0),
+            'Has Warranty': column('has_warranty', False),
+            'Has Shipping Info': column('has_shipping_info', False)
+        }
         
+        # Pricing breakdown and specifications, only where available
+        optional_columns = {
+            'Price (JPY)': [price if price else None for price in jpy_prices],
+            'Exchange Rate Used': [
+                product.get('exchange_rate', 0) if price else None
+                for product, price in zip(products, jpy_prices)
+            ],
+            'Specifications': [
+                '; '.join([f"{k}: {v}" for k, v in specs.items() if k and v]) if specs else None
+                for specs in column('specifications', None)
+            ]
+        }
+
+        # Convert all scrape timestamps to naive local datetimes in one vectorized pass;
+        # openpyxl writes them as real Excel dates rather than text
+        columns['Scraped Date'] = pd.to_datetime(
+            columns['Scraped Date'], unit='s', utc=True
+        ).tz_convert(datetime.now().astimezone().tzinfo).tz_localize(None).floor('s')
+
+        for name, values in optional_columns.items():
+            if any(value is not None for value in values):
+                columns[name] = values
+
         # Create DataFrame and save
-        df = pd.DataFrame(excel_data)
+        df = pd.DataFrame(columns)
         
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Products', index=False)
-            
-            # Get workbook and worksheet for formatting
-            workbook = writer.book
-            worksheet = writer.sheets['Products']
-            
-            from openpyxl.styles import Font, PatternFill
-            
-            # Format headers
-            header_font = Font(bold=True, color='FFFFFF')
-            header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-            
-            for cell in worksheet[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-            
-            # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                
-                # Set width with some padding, max 50
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-            
-            # Create summary sheet
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            summary_data = {
-                'Metric': [
-                    'Total Products Scraped',
-                    'Products with Valid Prices',
-                    'Products with SKU',
-                    'Products with Brand Info',
-                    'Products with Images',
-                    'Average Price (KES)',
-                    'Highest Price (KES)',
-                    'Lowest Price (KES)',
-                    'Scraping Date',
-                    'Source Website'
-                ],
-                'Value': [
-                    len(df),
-                    len(df[df['Price (KES)'] > 0]) if 'Price (KES)' in df.columns else 0,
-                    len(df[df['SKU'].astype(str).str.len() > 0]) if 'SKU' in df.columns else 0,
-                    len(df[df['Brand'].astype(str).str.len() > 0]) if 'Brand' in df.columns else 0,
-                    len(df[df['Total Images'] > 0]) if 'Total Images' in df.columns else 0,
-                    f"{df[df['Price (KES)'] > 0]['Price (KES)'].mean():.2f}" if len(df[df['Price (KES)'] > 0]) > 0 and 'Price (KES)' in df.columns else "0",
-                    f"{df['Price (KES)'].max():.2f}" if 'Price (KES)' in df.columns and df['Price (KES)'].max() > 0 else "0",
-                    f"{df[df['Price (KES)'] > 0]['Price (KES)'].min():.2f}" if len(df[df['Price (KES)'] > 0]) > 0 and 'Price (KES)' in df.columns else "0",
-                    timestamp,
-                    products[0].get('source_url', '') if products else ''
-                ]
-            }
-            
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
-            
-            # Format summary sheet
-            summary_worksheet = writer.sheets['Summary']
-            for cell in summary_worksheet[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-            
-            # Auto-adjust summary columns
-            for column in summary_worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                
-                adjusted_width = min(max_length + 2, 60)
-                summary_worksheet.column_dimensions[column_letter].width = adjusted_width
+        # Write-only workbook streams rows to disk instead of keeping a cell tree
+        workbook = Workbook(write_only=True)
+        
+        # Write-only sheets need widths before any row: size each column from its
+        # longest value in one vectorized pass per column, with padding, max 50
+        widths = [
+            min(max(len(str(column)), int(df[column].astype(str).str.len().max()) if len(df) else 0) + 2, 50)
+            for column in df.columns
+        ]
+        self._write_sheet(workbook, 'Products', df, widths)
+        
+        # Create summary sheet
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        # Counts and price stats from NumPy arrays instead of repeated masked frames
+        prices = df['Price (KES)'].to_numpy(dtype=float)
+        valid_prices = prices[prices > 0]
+        
+        summary_data = {
+            'Metric': [
+                'Total Products Scraped',
+                'Products with Valid Prices',
+                'Products with SKU',
+                'Products with Brand Info',
+                'Products with Images',
+                'Average Price (KES)',
+                'Highest Price (KES)',
+                'Lowest Price (KES)',
+                'Scraping Date',
+                'Source Website'
+            ],
+            'Value': [
+                len(df),
+                int(valid_prices.size),
+                int((df['SKU'].to_numpy() != '').sum()),
+                int((df['Brand'].to_numpy() != '').sum()),
+                int((df['Total Images'].to_numpy() > 0).sum()),
+                f"{valid_prices.mean():.2f}" if valid_prices.size else "0",
+                f"{valid_prices.max():.2f}" if valid_prices.size else "0",
+                f"{valid_prices.min():.2f}" if valid_prices.size else "0",
+                timestamp,
+                products[0].get('source_url', '') if products else ''
+            ]
+        }
         
-        self.logger.info(f"Excel file saved: {file_path}")
-        return file_path
\ No newline at end of file
+        summary_df = pd.DataFrame(summary_data)
+        
+        # Summary is ten rows, so size its columns from the values, max 60
+        summary_widths = [
+            min(max(len(str(value)) for value in [column, *summary_df[column]]) + 2, 60)
+            for column in summary_df.columns
+        ]
+        self._write_sheet(workbook, 'Summary', summary_df, summary_widths)
+        
+        # Same as workbook.save(), but with a cheaper deflate level: the sheet XML
+        # still compresses well and the file is written once per run. This drives
+        # openpyxl's internal ExcelWriter (what save_workbook() uses), so check here
+        # first if an openpyxl upgrade breaks saving
+        try:
+            with ZipFile(file_path, 'w', ZIP_DEFLATED, allowZip64=True,
+                         compresslevel=self.config.get('excel_compress_level', 1)) as archive:
+                ExcelWriter(workbook, archive).save()
+        except Exception:
+            # Don't leave a truncated workbook behind
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        
+        self.logger.info("Excel file saved: %s", file_path)
+        return file_path
+    
+    def _write_sheet(self, workbook: 'Workbook', title: str, df: 'pd.DataFrame', widths: List[float]) -> None:
+        """Stream a DataFrame into a new write-only sheet with a styled header row."""
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
+        
+        header_font, header_fill = _header_styles()
+        worksheet = workbook.create_sheet(title)
+        for index, width in enumerate(widths, 1):
+            worksheet.column_dimensions[get_column_letter(index)].width = width
+        
+        header = []
+        for column in df.columns:
+            cell = WriteOnlyCell(worksheet, value=column)
+            cell.font = header_font
+            cell.fill = header_fill
+            header.append(cell)
+        worksheet.append(header)
+        
+        # Missing optional values are NaN in the DataFrame; write them as empty cells
+        for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+            worksheet.append(row)
+
+
+@lru_cache(maxsize=None)
+def _header_styles() -> Tuple[Any, Any]:
+    """Excel header font and fill, built once on first save rather than on every save."""
+    from openpyxl.styles import Font, PatternFill
+    
+    return (
+        Font(bold=True, color='FFFFFF'),
+        PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+    )
+
+
+# Static functions for multiprocessing
+def parse_listing_page(html: str, base_url: str, parser: str = 'lxml') -> List[str]:
+    """Parse a listing page and return its product page links."""
+    soup = BeautifulSoup(html, parser)
+    return _extract_product_links(soup, base_url)
+
+
+def parse_product_page(html: str, product_url: str,
+                       extract_descriptions: bool = True,
+                       extract_images: bool = True,
+                       parser: str = 'lxml') -> Dict[str, Any]:
+    """Parse a product page and return its product data."""
+    soup = BeautifulSoup(html, parser)
+    return _extract_polish_venture_data(soup, product_url, extract_descriptions, extract_images)
+
+
+def _extract_product_links(soup: BeautifulSoup, base_url: str) -> List[str]:
+    """Extract product page links from listing page."""
+    product_links = set()
+    
+    # Polish Venture specific product link selectors
+    link_selectors = [
+        'a[href*="/product/"]',
+        '.product-item a[href]',
+        '.product a[href]',
+        '.woocommerce-loop-product__link[href]',
+        'h2 a[href]',
+        'h3 a[href]'
+    ]
+    
+    # Parse the page URL once; most hrefs are absolute or root-relative
+    parsed_base = urlparse(base_url)
+    origin = f"{parsed_base.scheme}://{parsed_base.netloc}"
+    seen_hrefs = set()
+    
+    for selector in link_selectors:
+        links = soup.select(selector)
+        for link in links:
+            href = link.get('href')
+            if href and href not in seen_hrefs:
+                seen_hrefs.add(href)
+                if href.startswith(('http://', 'https://')):
+                    absolute_url = href
+                elif href.startswith('/') and not href.startswith('//'):
+                    absolute_url = origin + href
+                else:
+                    absolute_url = urljoin(base_url, href)
+                if _is_product_url(absolute_url):
+                    product_links.add(absolute_url)
+    
+    return list(product_links)
+
+
+def _is_product_url(url: str) -> bool:
+    """Check if URL is a product page."""
+    url_lower = url.lower()
+    return (
+        '/product/' in url_lower and
+        not any(exclude in url_lower for exclude in [
+            'add-to-cart', 'filter', 'page=', 'orderby=', 'category'
+        ])
+    )
+
+
+# Product page selectors, compiled once. Each field keeps its own tuple in
+# priority order: a combined pattern would match in document order instead,
+# letting e.g. a site-title h1 or <p class="price"> win over the real field
+NAME_SELECTORS = tuple(sv.compile(selector) for selector in (
+    'h1.entry-title', 'h1.product_title', 'h1.product-title',
+    '.product_title', '.entry-title', 'h1'
+))
+MAIN_AREA_SELECTORS = tuple(sv.compile(selector) for selector in (
+    '.single-product-wrapper', '.product-detail', '.entry-summary', '.summary'
+))
+PRICE_SELECTORS = tuple(sv.compile(selector) for selector in (
+    '.woocommerce-Price-amount bdi', '.woocommerce-Price-amount',
+    '.price .amount', '.price bdi', '.price'
+))
+SKU_SELECTORS = tuple(sv.compile(selector) for selector in ('.sku', '.product_meta .sku', '[data-sku]'))
+BRAND_SELECTORS = tuple(sv.compile(selector) for selector in ('.brand', '.product_meta .brand', '[data-brand]'))
+DESCRIPTION_SELECTORS = tuple(sv.compile(selector) for selector in (
+    '.woocommerce-product-details__short-description',
+    '.product-short-description', '.entry-summary p', '.summary p'
+))
+IMAGE_SELECTORS = tuple(sv.compile(selector) for selector in (
+    '.woocommerce-product-gallery img', '.product-image img',
+    '.wp-post-image', '.attachment-shop_single'
+))
+
+# Currency marker and amount in one scan; the amount may come before or after it
+KES_PRICE_PATTERN = re.compile(
+    r'(?:KSh|KES)\s*(?P<amount>\d[\d,]*(?:\.\d+)?)'
+    r'|(?P<amount_before>\d[\d,]*(?:\.\d+)?)\s*(?:KSh|KES)'
+)
+
+
+def _first_matches(tag, selectors):
+    """Yield the first element each selector matches, in selector priority order."""
+    for selector in selectors:
+        element = selector.select_one(tag)
+        if element is not None:
+            yield element
+
+
+def _parse_kes_price(text: str) -> Optional[float]:
+    """Parse the first KSh/KES amount in text."""
+    match = KES_PRICE_PATTERN.search(text)
+    if not match:
+        return None
+    return float((match.group('amount') or match.group('amount_before')).replace(',', ''))
+
+
+def _extract_polish_venture_data(soup: BeautifulSoup, product_url: str,
+                                 extract_descriptions: bool = True,
+                                 extract_images: bool = True) -> Dict[str, Any]:
+    """Extract detailed data from Polish Venture product page - speed optimized."""
+    product_data = {
+        'source_url': product_url,
+        'scraped_at': time.time()
+    }
+    
+    # Quick exit if page seems invalid
+    page_text = soup.get_text()
+    if not soup.title or len(page_text) < 100:
+        return {}
+    
+    # Extract product name
+    for element in _first_matches(soup, NAME_SELECTORS):
+        name = element_text(element)
+        if name and len(name) > 3:
+            product_data['name'] = clean_product_name(name)
+            break
+    
+    # Extract price with multiple methods
+    all_prices = []
+    
+    # Method 1: Structured data (JSON-LD)
+    json_scripts = soup.find_all('script', type='application/ld+json')
+    for script in json_scripts:
+        try:
+            data = json.loads(script.string)
+            if isinstance(data, dict) and '@graph' in data:
+                for item in data['@graph']:
+                    if item.get('@type') == 'Product' and 'offers' in item:
+                        for offer in item['offers']:
+                            if 'priceSpecification' in offer:
+                                for price_spec in offer['priceSpecification']:
+                                    price_str = price_spec.get('price')
+                                    if price_str:
+                                        try:
+                                            price_value = float(price_str)
+                                            if price_value > 0:
+                                                all_prices.append(price_value)
+                                                break
+                                        except ValueError:
+                                            continue
+        except (json.JSONDecodeError, KeyError, TypeError):
+            continue
+    
+    # Method 2: Main product area
+    if not all_prices:
+        main_area = next(_first_matches(soup, MAIN_AREA_SELECTORS), None)
+    
+        if main_area:
+            # Only the first valid price is used, so stop at the first match
+            elements = (element for selector in PRICE_SELECTORS for element in selector.iselect(main_area))
+            for element in elements:
+                price_value = _parse_kes_price(element_text(element))
+                if price_value and price_value > 100:  # Filter out obvious errors
+                    all_prices.append(price_value)
+                    break
+    
+    # Set pricing information
+    if all_prices:
+        price = all_prices[0]  # Take the first valid price
+        product_data['price_kes'] = price
+        product_data['original_currency'] = 'KES'
+        product_data['raw_price_text'] = f'KSh {price:,.2f}'
+    
+    # Extract SKU
+    for element in _first_matches(soup, SKU_SELECTORS):
+        # Attribute lookup is a dict get; only walk the text when it is absent
+        sku = element.get('data-sku') or element.get('data-product-id') or element_text(element)
+        if sku:
+            product_data['sku'] = sku
+            break
+    
+    # Extract brand
+    for element in _first_matches(soup, BRAND_SELECTORS):
+        brand = element_text(element)
+        if brand:
+            product_data['brand'] = brand
+            break
+    
+    # Extract category
+    category_selectors = ['.product_meta .posted_in a', '.breadcrumb a', '.category a']
+    categories = []
+    for selector in category_selectors:
+        elements = soup.select(selector)
+        for element in elements:
+            cat = element_text(element)
+            if cat and cat.lower() not in ['home', 'shop']:
+                categories.append(cat)
+    
+    if categories:
+        product_data['category'] = ' > '.join(categories[:3])  # Limit to 3 levels
+    
+    # Extract description (only if enabled for speed)
+    if extract_descriptions:
+        for element in _first_matches(soup, DESCRIPTION_SELECTORS):
+            desc = element_text(element)
+            if desc and len(desc) > 20:
+                product_data['description'] = desc[:300]  # Reduced from 500 to 300
+                break
+    
+    # Extract stock status
+    stock_element = soup.select_one('.stock')
+    if stock_element:
+        stock_text = element_text(stock_element).lower()
+        if 'in stock' in stock_text:
+            product_data['stock_status'] = 'In Stock'
+        elif 'out of stock' in stock_text:
+            product_data['stock_status'] = 'Out of Stock'
+    
+    # Extract images (only if enabled in config for speed)
+    if extract_images:
+        # First valid image among each selector's first 3 matches (reduced from 5 for speed)
+        sources = (
+            next((src for img in selector.iselect(soup, 3) if (src := img.get('src') or img.get('data-src'))), None)
+            for selector in IMAGE_SELECTORS
+        )
+        images = [urljoin(product_url, src) for src in sources if src]
+    
+        product_data['images'] = images
+        product_data['primary_image'] = images[0] if images else None
+    else:
+        product_data['images'] = []
+        product_data['primary_image'] = None
+    
+    # Check for warranty and shipping info
+    page_text = page_text.lower()
+    product_data['has_warranty'] = 'warranty' in page_text or 'guarantee' in page_text
+    product_data['has_shipping_info'] = 'shipping' in page_text or 'delivery' in page_text
+    
+    return product_data
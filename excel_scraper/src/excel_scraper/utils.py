@@ -1,21 +1,35 @@
+import atexit
 import logging
+import queue
 import re
-from datetime import datetime
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+from bs4 import NavigableString
+
 
 def setup_logging() -> logging.Logger:
-    """Setup logging for performance monitoring."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
+    """Setup logging for performance monitoring; console writes happen on a background thread."""
+    root = logging.getLogger()
+    if not root.handlers:
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        
+        # Scraping code only enqueues records; the listener thread does the I/O
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, console)
+        listener.start()
+        atexit.register(listener.stop)
+        
+        root.addHandler(QueueHandler(log_queue))
+        root.setLevel(logging.INFO)
     return logging.getLogger("fast_scraper")
 
 
 def generate_filename(prefix: str = "scraped_products") -> str:
     """Generate filename with timestamp."""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    timestamp = time.strftime('%Y%m%d_%H%M%S')
     return f"{prefix}_{timestamp}.xlsx"
 
 
@@ -36,16 +50,29 @@ def clean_product_name(name: str) -> str:
     return re.sub(r'\s+', ' ', name).strip()[:200]
 
 
+def element_text(element) -> str:
+    """Get stripped tag text, skipping the recursive walk for single-string tags."""
+    text = element.string
+    # Exact type check: comments and CDATA are NavigableString subclasses but not text
+    if type(text) is NavigableString:
+        return text.strip()
+    return element.get_text(strip=True)
+
+
 def is_valid_url(url: str) -> bool:
     """Check if URL is valid."""
     return url.startswith(('http://', 'https://')) and '.' in url
 
 
 def format_duration(seconds: float) -> str:
-    """Format duration."""
+    """Format duration with one decimal (built from integer tenths)."""
     if seconds < 60:
-        return f"{seconds:.1f}s"
+        value, unit = seconds, 's'
     elif seconds < 3600:
-        return f"{seconds/60:.1f}m"
+        value, unit = seconds / 60, 'm'
     else:
-        return f"{seconds/3600:.1f}h"
+        value, unit = seconds / 3600, 'h'
+    
+    sign = '-' if value < 0 else ''
+    tenths = int(abs(value) * 10 + 0.5)
+    return f"{sign}{tenths // 10}.{tenths % 10}{unit}"